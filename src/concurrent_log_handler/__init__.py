@@ -54,49 +54,55 @@ This module supports Python 3.6 and later.
 (Support for older version was dropped in 0.9.23.)
 """
 
+import codecs
+import copy
 import datetime
 import errno
+import importlib.util
+import locale
 import logging
 import os
+import queue
+import shutil
+import stat
 import sys
+import threading
 import time
 import traceback
 import warnings
-from contextlib import contextmanager
-from io import TextIOWrapper
+from contextlib import contextmanager, suppress
+from io import BufferedReader, BufferedWriter, TextIOWrapper
 from logging.handlers import BaseRotatingHandler, TimedRotatingFileHandler
-from typing import TYPE_CHECKING, Dict, Generator, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from portalocker import LOCK_EX, lock, unlock
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
 try:
     import grp
     import pwd
 except ImportError:
     pwd = grp = None  # type: ignore[assignment]
 
-# Random numbers for rotation temp file names, using secrets module if available (Python 3.6).
-# Otherwise use `random.SystemRandom` if available, then fall back on `random.Random`.
-try:
-    from secrets import randbits
-except ImportError:
-    import random
-
-    if hasattr(random, "SystemRandom"):  # May not be present in all Python editions
-        # Should be safe to reuse `SystemRandom` - not software state dependant
-        randbits = random.SystemRandom().getrandbits
-    else:
-
-        def randbits(k: int) -> int:
-            return random.Random().getrandbits(k)
-
-
 try:
     import gzip
 except ImportError:
     gzip = None  # type: ignore[assignment]
 
 __all__ = [
+    "AsyncConcurrentRotatingFileHandler",
     "ConcurrentRotatingFileHandler",
     "ConcurrentTimedRotatingFileHandler",
 ]
@@ -104,6 +110,26 @@ __all__ = [
 HAS_CHOWN: bool = hasattr(os, "chown")
 HAS_CHMOD: bool = hasattr(os, "chmod")
 
+# A single write() of up to this many bytes to a file opened with O_APPEND is not
+# interleaved with appends from other processes. See `use_kernel_append`.
+_ATOMIC_APPEND_SIZE = 4096
+
+# Codecs (by their normalized name) which str.encode() implements without a codec lookup.
+_BUILTIN_ENCODINGS = ("utf-8", "ascii", "iso8859-1")
+
+# Queue type used by AsyncConcurrentRotatingFileHandler; None is the stop sentinel.
+_RecordQueue = Union[
+    "queue.Queue[Optional[logging.LogRecord]]",
+    "queue.SimpleQueue[Optional[logging.LogRecord]]",
+]
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write data to a file descriptor, with as few write() calls as possible."""
+    written = os.write(fd, data)
+    while written < len(data):  # only if the disk is full or similar
+        written += os.write(fd, data[written:])
+
 
 class ConcurrentRotatingFileHandler(BaseRotatingHandler):
     """Handler for logging to a set of files, which switches from one file to the
@@ -112,7 +138,7 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
     exceed the given size.
     """
 
-    def __init__(  # noqa: PLR0913
+    def __init__(  # noqa: PLR0913, PLR0915
         self,
         filename: str,
         mode: str = "a",
@@ -129,11 +155,23 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         terminator: str = "\n",
         unicode_error_policy: str = "ignore",
         lock_file_directory: Optional[str] = None,
+        gzip_compresslevel: int = 9,
+        gzip_buffer_size: int = 64 * 1024,
+        use_kernel_append: bool = False,
+        use_zstd: bool = False,
+        zstd_level: int = 3,
+        per_process: bool = False,
+        keep_file_open: bool = True,
+        write_buffer_size: int = 0,
+        write_buffer_flush_seconds: float = 1.0,
+        background_compression: bool = False,
+        use_pigz: bool = False,
     ):
         """Open the specified file and use it as the stream for logging.
 
         :param filename: name of the log file to output to.
-        :param mode: write mode: defaults to 'a' for text append
+        :param mode: write mode: defaults to 'a' for append. The file is always written
+            in binary; records are encoded using `encoding`.
         :param maxBytes: rotate the file at this size in bytes
         :param backupCount: number of rotated files to keep before deleting.
             Avoid setting this very high, probably 20 or less, and prefer setting maxBytes higher.
@@ -161,6 +199,40 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         drive like Dropbox, OneDrive, Google Docs, etc., which may prevent the lock files
         from working correctly. The lock file must be accessible to all processes writing
         to a shared log, including across all different hosts (machines).
+        :param gzip_compresslevel: compression level (1-9) used when use_gzip is set.
+        Lower levels are faster but compress less. Default is 9, the same as the gzip module.
+        :param gzip_buffer_size: size in bytes of the chunks copied from the rotated
+        log file into the compressed (gzip or zstd) file.
+        :param use_kernel_append: (Unix only) write records of up to 4 KiB without taking
+        the lock, relying on the kernel to keep O_APPEND writes from different processes
+        apart. The lock is still used for larger records, whenever the file is due for
+        rollover, and after another process has rotated it. Not used with use_gzip,
+        use_zstd, or with encodings that write a BOM.
+        :param use_zstd: compress rotated logs with Zstandard (`.zst`) instead of gzip.
+        Requires the optional `zstandard` package, and takes precedence over use_gzip.
+        :param zstd_level: compression level used when use_zstd is set.
+        :param per_process: give each process its own log file, named after its pid
+        (`app.log` becomes e.g. `app.1234.log`), and skip file locking altogether.
+        Each file is rotated on its own. After a fork() the child switches to a file
+        of its own on its first write.
+        :param keep_file_open: (Unix only) keep the log file open between records
+        instead of opening and closing it for every record. Before each write, with the
+        lock held, the handler checks that the file it has open is still the current log
+        file, in case another process has rotated it. Has no effect on Windows, where an
+        open file can't be renamed by the other processes.
+        :param write_buffer_size: hold formatted records in memory until about this many
+        characters have accumulated, then write them all at once with a single lock. The
+        default of 0 writes each record right away. Buffered records are also written out
+        by flush() and close(), but are lost if the process dies first.
+        :param write_buffer_flush_seconds: with write_buffer_size, also write out the
+        buffered records no later than this many seconds after they were logged, even if
+        nothing else is logged in the meantime. 0 means only when the buffer is full.
+        :param background_compression: (Unix only) compress rotated files (see use_gzip
+        and use_zstd) on a background thread, so that the rollover doesn't hold the
+        lock, or the thread that logged the record, for the duration of the compression.
+        Until it's done, the newest backup stays uncompressed (e.g. `app.log.1`).
+        :param use_pigz: with use_gzip, compress with the `pigz` program, which uses all
+        CPU cores, if it can be found on the PATH. Otherwise the gzip module is used.
 
         By default, the file grows indefinitely. You can specify particular
         values of maxBytes and backupCount to allow the file to rollover at
@@ -188,7 +260,7 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         the RotatingFileHandler is used by another.
         """
         # noinspection PyTypeChecker
-        self.stream: Optional[TextIOWrapper] = None  # type: ignore[assignment]
+        self.stream: Optional[BufferedWriter] = None  # type: ignore[assignment]
         self.stream_lock: Optional[TextIOWrapper] = None
         self.owner = owner
         self.chmod = chmod
@@ -200,8 +272,32 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         self.newline = newline
 
         self._debug = debug
-        self.use_gzip = bool(gzip and use_gzip)
-        self.gzip_buffer = 8096
+        # zstandard, like subprocess and concurrent.futures, is only imported when
+        # first used, so that programs which never rotate don't pay to import it.
+        if use_zstd and importlib.util.find_spec("zstandard") is None:
+            use_zstd = False
+            warnings.warn(
+                "concurrent_log_handler use_zstd requires the zstandard package. "
+                "Rotated logs will not be compressed with zstd.",
+                UserWarning,
+                stacklevel=3,
+            )
+        self.use_zstd = use_zstd
+        self.zstd_level = zstd_level
+        self.use_gzip = bool(gzip and use_gzip) and not self.use_zstd
+        self.gzip_compresslevel = gzip_compresslevel
+        self.gzip_buffer = gzip_buffer_size
+        # Extension of the rotated files, if they are compressed.
+        self.compress_ext = ".zst" if self.use_zstd else ".gz" if self.use_gzip else ""
+        # On Windows the open file would keep other processes from renaming it.
+        self.background_compression = background_compression and os.name == "posix"
+        self._pigz = shutil.which("pigz") if use_pigz else None
+        self._compress_executor: Optional["ThreadPoolExecutor"] = None
+        # Background compression jobs: the future, the output file, and the
+        # (device, inode) of the rotated file being compressed.
+        self._compress_jobs: List[Tuple["Future[None]", str, Tuple[int, int]]] = []
+        # The process which started the executor and the jobs.
+        self._compress_pid: Optional[int] = None
         self.maxLockAttempts = 20
 
         if unicode_error_policy not in ("ignore", "replace", "strict"):
@@ -223,20 +319,69 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
             )
 
         # Construct the handler with the given arguments in "delayed" mode
-        # because we will handle opening the file as needed. File name
-        # handling is done by FileHandler since Python 2.5.
-        super(ConcurrentRotatingFileHandler, self).__init__(
-            filename, mode, encoding=encoding, delay=True
-        )
+        # because we will handle opening the file as needed.
+        super().__init__(filename, mode, encoding=encoding, delay=True)
+
+        self.per_process = per_process
+        # In per_process mode, the name given to us and the process using it now.
+        self._shared_filename = self.baseFilename
+        self._file_pid: Optional[int] = None
 
         self.terminator = terminator or "\n"
 
+        # The log file is opened in binary mode and records are encoded here, instead of
+        # going through a text mode stream. Line endings are translated by hand the same way
+        # a text mode stream with the given `newline` setting would.
+        if self.encoding in (None, "locale"):
+            self._encoding = locale.getpreferredencoding(False)
+        else:
+            self._encoding = self.encoding
+        self._newline_out = os.linesep if newline is None else newline or "\n"
+        # Codecs like utf-8-sig or utf-16 start with a BOM, which only belongs at the very
+        # start of the file.
+        codec = codecs.lookup(self._encoding)
+        self._encoding_has_bom = bool(codec.encode("")[0])
+        # str.encode() has to look the codec up by name each time, except for a few
+        # encodings it handles directly. For the rest, keep the encode function.
+        self._encoder = None if codec.name in _BUILTIN_ENCODINGS else codec.encode
+
+        # Without the lock, a record could be appended to a rotated file just as it's
+        # being compressed and deleted, so that mode doesn't mix with compression.
+        self.use_kernel_append = (
+            use_kernel_append
+            and os.name == "posix"
+            and not self.compress_ext
+            and not self._encoding_has_bom
+        )
+        self._append_fd: Optional[int] = None
+        self.keep_file_open = keep_file_open and os.name == "posix"
+        # Size of the log file as found by _check_stream(), for the next rollover check.
+        self._stream_size: Optional[int] = None
+
+        self.write_buffer_size = max(write_buffer_size, 0)
+        self._write_buffer: List[str] = []
+        self._write_buffer_len = 0
+        # The last record buffered, for the rollover check and error reporting.
+        self._write_buffer_record: Optional[logging.LogRecord] = None
+        # The process the buffered records belong to.
+        self._write_buffer_pid: Optional[int] = None
+        self.write_buffer_flush_seconds = max(write_buffer_flush_seconds, 0)
+        # Pending timer which will flush the buffer; see _start_flush_timer().
+        self._write_buffer_timer: Optional[threading.Timer] = None
+        # Guards the write buffer; see _buffer_lock().
+        self._write_buffer_lock = threading.RLock()
+        self._write_buffer_lock_pid = os.getpid()
+        if per_process:
+            self._use_process_file()
+
         if self.owner and HAS_CHOWN and pwd and grp:
             self._set_uid = pwd.getpwnam(self.owner[0]).pw_uid
             self._set_gid = grp.getgrnam(self.owner[1]).gr_gid
 
         self.lockFilename = self.getLockFilename(lock_file_directory)
         self.is_locked = False
+        # The process which opened stream_lock; see _open_lockfile().
+        self._lock_pid: Optional[int] = None
 
         # This is primarily for the benefit of the unit tests.
         self.num_rollovers = 0
@@ -274,9 +419,16 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
                     raise
 
     def _open_lockfile(self) -> None:
+        """Open the lock file, unless it's already open. It's kept open for the life of
+        the handler, and only locked and unlocked around each write."""
         if self.stream_lock and not self.stream_lock.closed:
-            self._console_log("Lockfile already open in this process")
-            return
+            if self._lock_pid == os.getpid():
+                return
+            # We've been forked. Locks are shared between the processes when they use
+            # the same open file, so this process needs its own.
+            self._console_log("Re-opening lockfile after fork")
+            self.is_locked = False
+            self._close_lockfile()
         lock_file = self.lockFilename
         # self._console_log(
         #     f"concurrent-log-handler {hash(self)} opening {lock_file}",
@@ -285,9 +437,17 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
 
         with self._alter_umask():
             self.stream_lock = self.atomic_open(lock_file)
+        self._lock_pid = os.getpid()
 
         self._do_chown_and_chmod(lock_file)
 
+    def _close_lockfile(self) -> None:
+        if self.stream_lock:
+            try:
+                self.stream_lock.close()
+            finally:
+                self.stream_lock = None
+
     def atomic_open(self, file_path: str) -> TextIOWrapper:
         try:
             # Attempt to open the file in "r+" mode
@@ -305,29 +465,26 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         return file
 
     def _open(self, mode: None = None) -> None:  # type: ignore[override]  # noqa: ARG002
-        # Normally we don't hold the stream open. Only do_open does that
-        # which is called from do_write().
+        # The stream is only opened by do_open(), with the lock held.
         return None
 
-    def do_open(self, mode: Optional[str] = None) -> TextIOWrapper:
+    def do_open(self, mode: Optional[str] = None) -> BufferedWriter:
         """
-        Open the current base file with the (original) mode and encoding.
+        Open the current base file with the (original) mode, in binary.
         Return the resulting stream.
 
         Note:  Copied from stdlib.  Added option to override 'mode'
         """
         if mode is None:
             mode = self.mode
+        mode = mode.replace("t", "")
+        if "b" not in mode:
+            mode += "b"
 
         with self._alter_umask():
-            stream = open(
-                self.baseFilename,
-                mode=mode,
-                encoding=self.encoding,
-                newline=self.newline,
-            )
+            stream = open(self.baseFilename, mode=mode)
         if TYPE_CHECKING:
-            assert isinstance(stream, TextIOWrapper)
+            assert isinstance(stream, BufferedWriter)
 
         self._do_chown_and_chmod(self.baseFilename)
 
@@ -349,6 +506,7 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         """Close file stream.  Unlike close(), we don't tear anything down, we
         expect the log to be re-opened after rotation."""
 
+        self._stream_size = None
         if self.stream:
             try:
                 if not self.stream.closed:
@@ -362,8 +520,6 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
     def _console_log(self, msg: str, stack: bool = False) -> None:
         if not self._debug:
             return
-        import threading
-
         tid = threading.current_thread().name
         pid = os.getpid()
         stack_str = ""
@@ -381,55 +537,263 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         """
         try:
             msg = self.format(record)
+            if self.write_buffer_size:
+                with self._buffer_lock():
+                    self._buffer_write(msg, record)
+            else:
+                self._write_locked(msg, record)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _buffer_lock(self) -> threading.RLock:
+        """The lock to hold while using the write buffer. This is not the handler's own
+        lock, which logging.shutdown() holds while calling close(), and Handler.handle()
+        while AsyncConcurrentRotatingFileHandler waits for room on its queue. Either way,
+        the background thread must still be able to write for the wait to end."""
+        if self._write_buffer_lock_pid != os.getpid():
+            # A lock held by another thread at fork() time would never be released here.
+            self._write_buffer_lock = threading.RLock()
+            self._write_buffer_lock_pid = os.getpid()
+        return self._write_buffer_lock
+
+    def _buffer_write(self, msg: str, record: logging.LogRecord) -> None:
+        """Add a formatted message to the write buffer, and write the buffer out if full."""
+        if self._write_buffer_pid != os.getpid():
+            # Anything buffered before a fork() is for the parent process to write.
+            self._write_buffer = []
+            self._write_buffer_len = 0
+            self._write_buffer_pid = os.getpid()
+            self._write_buffer_timer = None  # the parent's timer thread isn't ours
+        self._write_buffer.append(msg)
+        self._write_buffer_len += len(msg)
+        self._write_buffer_record = record
+        if self._write_buffer_len >= self.write_buffer_size:
+            self._flush_write_buffer()
+        elif self._write_buffer_timer is None and self.write_buffer_flush_seconds:
+            self._start_flush_timer()
+
+    def _start_flush_timer(self) -> None:
+        """Flush the write buffer after write_buffer_flush_seconds, in case nothing else
+        is logged to fill it up by then. One timer is kept pending at a time, rather than
+        one per buffer, so a busy handler doesn't start a thread for every flush."""
+        timer = threading.Timer(self.write_buffer_flush_seconds, self._flush_on_timer)
+        timer.name = "ConcurrentLogHandlerFlush"
+        timer.daemon = True
+        self._write_buffer_timer = timer
+        timer.start()
+
+    def _flush_on_timer(self) -> None:
+        with self._buffer_lock():
+            self._write_buffer_timer = None
+        self.flush()
+
+    def _flush_write_buffer(self) -> None:
+        msgs = self._write_buffer
+        record = self._write_buffer_record
+        if not msgs or record is None or self._write_buffer_pid != os.getpid():
+            return
+        self._write_buffer = []
+        self._write_buffer_len = 0
+        self._write_buffer_record = None
+        self._write_locked(self.terminator.join(msgs), record)
+
+    def emit_batch(self, records: Sequence[logging.LogRecord]) -> None:
+        """Emit several records while taking the file lock only once.
+
+        All the records are formatted first, before the lock is obtained, and then written
+        with a single write. The rollover check is done once, before the write, so the whole
+        batch ends up in the same file. This is used by AsyncConcurrentRotatingFileHandler.
+        """
+        msgs = []
+        for record in records:
             try:
-                self._do_lock()
+                msgs.append(self.format(record))
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except Exception:
+                self.handleError(record)
+        if not msgs:
+            return
+        try:
+            if self.write_buffer_size:
+                with self._buffer_lock():
+                    self._buffer_write(self.terminator.join(msgs), records[-1])
+            else:
+                self._write_locked(self.terminator.join(msgs), records[-1])
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            self.handleError(records[-1])
+
+    def _write_locked(self, msg: str, record: logging.LogRecord) -> None:
+        """Obtain the lock, rollover if needed, and write the (already formatted) message."""
+        if self.per_process and self._file_pid != os.getpid():
+            self._use_process_file()
+        data = self._encode_unlocked(msg)
+        if self.use_kernel_append and data is not None and self._append_unlocked(data):
+            return
+        try:
+            self._do_lock()
+            # Open the log file once and use the same stream for the rollover size check
+            # and the write. doRollover() closes it, and do_write() re-opens as needed.
+            self._check_stream()
+            if self.stream is None or self.stream.closed:
+                self.stream = self.do_open()
+            if self._compress_jobs:
+                self._finish_compressions()
 
-                try:
-                    if self.shouldRollover(record):
-                        self.doRollover()
-                except Exception as e:
-                    self._console_log(
-                        f"Unable to do rollover: {e}\n{traceback.format_exc()}"
-                    )
-                    # Continue on anyway
+            try:
+                if self.shouldRollover(record):
+                    self.doRollover()
+            except Exception as e:
+                self._console_log(
+                    f"Unable to do rollover: {e}\n{traceback.format_exc()}"
+                )
+                # Continue on anyway
 
-                self.do_write(msg)
+            self.do_write(msg, data)
 
+        finally:
+            try:
+                if not self.keep_file_open:
+                    self._close()
             finally:
                 self._do_unlock()
+
+    def _check_stream(self) -> None:
+        """Close the log file stream kept open from an earlier record if another process
+        has rotated the file since. The lock must be held."""
+        self._stream_size = None
+        stream = self.stream
+        if stream is None or stream.closed or self.per_process:
+            return
+        try:
+            fd_stat = os.fstat(stream.fileno())
+            path_stat = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            self._close()
+            return
+        if (fd_stat.st_ino, fd_stat.st_dev) != (path_stat.st_ino, path_stat.st_dev):
+            self._close()
+            return
+        # Still the current file, so the rollover check can use this size.
+        self._stream_size = fd_stat.st_size
+
+    def _use_process_file(self) -> None:
+        """Point the handler at the log file of the current process (per_process mode)."""
+        self._file_pid = os.getpid()
+        root, ext = os.path.splitext(self._shared_filename)
+        self.baseFilename = f"{root}.{self._file_pid}{ext}"
+        # After a fork(), the streams still open are for the parent's file.
+        self._close()
+        self._close_append_fd()
+
+    def _append_unlocked(self, data: bytes) -> bool:
+        """Append an encoded message to the log file with a single write, without the lock.
+
+        Returns False, having written nothing, if the lock is needed after all: the
+        record is too large to append atomically, the file is due for rollover, or the
+        file we have open is no longer the current log file.
+        """
+        if len(data) > _ATOMIC_APPEND_SIZE:
+            return False
+        if self._append_fd is None:
+            with self._alter_umask():
+                self._append_fd = os.open(
+                    self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666
+                )
+            self._do_chown_and_chmod(self.baseFilename)
+        fd = self._append_fd
+        try:
+            fd_stat = os.fstat(fd)
+            path_stat = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            # Rotated away and not yet re-created.
+            self._close_append_fd()
+            return False
+        if (fd_stat.st_ino, fd_stat.st_dev) != (path_stat.st_ino, path_stat.st_dev):
+            self._close_append_fd()
+            return False
+        if 0 < self.maxBytes <= fd_stat.st_size + len(data):
+            return False
+        _write_all(fd, data)
+        return True
+
+    def _close_append_fd(self) -> None:
+        if self._append_fd is not None:
+            try:
+                os.close(self._append_fd)
+            finally:
+                self._append_fd = None
+
+    def flush(self) -> None:
+        """Write out any records held by the write buffer (see `write_buffer_size`).
+        Otherwise there is nothing to do; the stream is flushed on each write."""
+        if not self._write_buffer:
+            return
+        record = self._write_buffer_record
+        try:
+            with self._buffer_lock():
+                self._flush_write_buffer()
         except (KeyboardInterrupt, SystemExit):
             raise
         except Exception:
-            self.handleError(record)
+            if record is not None:
+                self.handleError(record)
 
-    def flush(self) -> None:
-        """Does nothing; stream is flushed on each write."""
+    def do_write(self, msg: str, data: Optional[bytes] = None) -> None:
+        """Handling writing an individual record; we do a fresh open every time
+        unless the caller already opened the stream, or it is kept open (see
+        `keep_file_open`). This assumes emit() has already locked the file.
 
-    def do_write(self, msg: str) -> None:
-        """Handling writing an individual record; we do a fresh open every time.
-        This assumes emit() has already locked the file."""
-        self.stream = self.do_open()
+        `data` is the message already encoded (with the terminator), if the caller did
+        that before taking the lock."""
+        if self.stream is None or self.stream.closed:
+            self.stream = self.do_open()
         stream = self.stream
 
-        msg = msg + self.terminator
-        try:
-            stream.write(msg)
-        except UnicodeError:
-            # Try to emit in a form acceptable to the output encoding
-            # The unicode_error_policy determines whether this is lossy.
-            try:
-                encoding = getattr(stream, "encoding", self.encoding or "us-ascii")
-                msg_bin = msg.encode(encoding, self.unicode_error_policy)
-                msg = msg_bin.decode(encoding, self.unicode_error_policy)
-                stream.write(msg)
-            except UnicodeError:
-                # self._console_log(str(e))
-                raise
+        if data is None:
+            data = self._encode(msg + self.terminator, stream)
+        # Nothing is ever left in the stream's buffer, so write straight to the file.
+        _write_all(stream.fileno(), data)
+        if not self.keep_file_open:
+            self._close()
 
-        stream.flush()
-        self._close()
+    def _encode_unlocked(self, msg: str) -> Optional[bytes]:
+        """Encode a message and its terminator before taking the lock, so that the lock
+        is held for as short a time as possible. Returns None if the encoding writes a
+        BOM at the start of the file, which can only be checked with the lock held."""
+        if self._encoding_has_bom:
+            return None
+        return self._encode(msg + self.terminator, None)
+
+    def _encode(self, msg: str, stream: Optional[BufferedWriter]) -> bytes:
+        """Encode a message for writing to the (binary) log file stream.
+
+        The stream is only needed (to check for the start of the file) when the encoding
+        writes a BOM. The unicode_error_policy determines what happens to characters the
+        encoding doesn't support; with 'strict' a UnicodeError is raised.
+        """
+        if self._newline_out != "\n":
+            msg = msg.replace("\n", self._newline_out)
+        if not self._encoding_has_bom:
+            if self._encoder is None:
+                return msg.encode(self._encoding, self.unicode_error_policy)
+            return self._encoder(msg, self.unicode_error_policy)[0]
+        if TYPE_CHECKING:
+            assert stream is not None
+        encoder = codecs.getincrementalencoder(self._encoding)(
+            self.unicode_error_policy
+        )
+        if stream.seek(0, 2) != 0:
+            encoder.setstate(0)  # not at the start of the file, so no BOM
+        return encoder.encode(msg, final=True)
 
     def _do_lock(self) -> None:
+        if self.per_process:
+            return  # nobody else writes to our file
         if self.is_locked:
             return  # already locked... recursive?
         self._open_lockfile()
@@ -450,27 +814,59 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
             self._console_log("No self.stream_lock to lock", stack=True)
 
     def _do_unlock(self) -> None:
+        if self.per_process:
+            return
         if self.stream_lock:
             if self.is_locked:
                 try:
                     unlock(self.stream_lock)
                     # self._console_log("Released lock")
+                except Exception:
+                    # Closing the file releases the lock as well. It's re-opened next time.
+                    self._close_lockfile()
+                    raise
                 finally:
                     self.is_locked = False
-                    self.stream_lock.close()
-                    self.stream_lock = None
         else:
             self._console_log("No self.stream_lock to unlock", stack=True)
 
     def close(self) -> None:
         """Close log stream and stream_lock."""
         self._console_log("In close()", stack=True)
+        timer = self._write_buffer_timer
+        if timer is not None:
+            timer.cancel()
+            self._write_buffer_timer = None
         try:
-            self._close()
+            try:
+                self.flush()
+                self._close()
+                self._close_append_fd()
+                self._wait_for_compressions()
+            finally:
+                self._close_lockfile()
+        finally:
+            super().close()
+
+    def _wait_for_compressions(self) -> None:
+        """Wait for any background compression to finish, put the results in place, and
+        stop the worker thread."""
+        executor, self._compress_executor = self._compress_executor, None
+        if self._compress_pid != os.getpid():
+            return  # the executor and jobs (if any) belong to the parent process
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if not self._compress_jobs:
+            self._compress_pid = None
+            return
+        try:
+            self._do_lock()
+            self._finish_compressions(wait=True)
         finally:
-            super(ConcurrentRotatingFileHandler, self).close()
+            self._do_unlock()
+            self._compress_pid = None
 
-    def doRollover(self) -> None:  # noqa: C901
+    def doRollover(self) -> None:  # noqa: C901, PLR0915
         """
         Do a rollover, as described in __init__().
         """
@@ -485,36 +881,57 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         # Determine if we can rename the log file or not. Windows refuses to
         # rename an open file, Unix is inode based, so it doesn't care.
 
-        # Attempt to rename logfile to tempname:
-        # There is a slight race-condition here, but it seems unavoidable
-        tmpname = None
-        while True:
-            tmpname = f"{self.baseFilename}.rotate.{randbits(64):08}"
-            if not os.path.exists(tmpname):
-                break
+        # Attempt to rename logfile to tempname. With 64 random bits the name won't
+        # collide with another process's, so there's no need to check that it's unused.
+        tmpname = f"{self.baseFilename}.rotate.{os.urandom(8).hex()}"
         try:
             # Do a rename test to determine if we can successfully rename the log file
             os.rename(self.baseFilename, tmpname)
 
-            if self.use_gzip:
-                self.do_gzip(tmpname)
+            if self.compress_ext and not self.background_compression:
+                self.do_compress(tmpname)
         except OSError as e:
             self._console_log(f"rename failed.  File in use? e={e}", stack=True)
             return
 
-        gzip_ext = ".gz" if self.use_gzip else ""
+        gzip_ext = self.compress_ext
+
+        # One directory listing instead of several stat() calls for every backup slot.
+        log_dir = os.path.dirname(self.baseFilename)
+        existing = self._list_directory(log_dir)
+        # Kept up to date as files are renamed (unused if the listing failed).
+        listed = existing if existing is not None else set()
+
+        def exists(path: str) -> bool:
+            if existing is not None and os.path.dirname(path) == log_dir:
+                return path in existing
+            # A custom namer may put the rotated files somewhere else, or we
+            # couldn't list the directory.
+            return os.path.exists(path)
 
         def do_rename(source_fn: str, dest_fn: str) -> None:
-            self._console_log(f"Rename {source_fn} -> {dest_fn + gzip_ext}")
-            if os.path.exists(dest_fn):
-                os.remove(dest_fn)
-            if os.path.exists(dest_fn + gzip_ext):
-                os.remove(dest_fn + gzip_ext)
+            if self._debug:  # skip building the message for every backup file
+                self._console_log(f"Rename {source_fn} -> {dest_fn + gzip_ext}")
             source_gzip = source_fn + gzip_ext
-            if os.path.exists(source_gzip):
-                os.rename(source_gzip, dest_fn + gzip_ext)
-            elif os.path.exists(source_fn):
-                os.rename(source_fn, dest_fn)
+            if exists(source_gzip):
+                source, dest, stale = source_gzip, dest_fn + gzip_ext, dest_fn
+            elif exists(source_fn):
+                source, dest, stale = source_fn, dest_fn, dest_fn + gzip_ext
+            else:
+                return
+            # os.replace() overwrites the destination, but if gzip was turned on or off
+            # we could also have a leftover copy under the other name.
+            if stale != dest and exists(stale):
+                with suppress(FileNotFoundError):
+                    os.remove(stale)
+                listed.discard(stale)
+            listed.discard(source)
+            try:
+                os.replace(source, dest)
+            except FileNotFoundError:
+                # Removed by someone else since we listed the directory; nothing to move.
+                return
+            listed.add(dest)
 
         # Q: Is there some way to protect this code from a KeyboardInterrupt?
         # This isn't necessarily a data loss issue, but it certainly does
@@ -527,15 +944,16 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         # code complexity isn't warranted.
 
         do_renames = []
+        sfn = self.rotation_filename(f"{self.baseFilename}.1")
         for i in range(1, self.backupCount):
-            sfn = self.rotation_filename(f"{self.baseFilename}.{i}")
-            dfn = self.rotation_filename(f"{self.baseFilename}.{i + 1}")
-            if os.path.exists(sfn + gzip_ext):
-                do_renames.append((sfn, dfn))
-            else:
+            # The file may still be uncompressed if it's being compressed in the background.
+            if not exists(sfn + gzip_ext) and not exists(sfn):
                 # Break looking for more rollover files as soon as we can't find one
                 # at the expected name.
                 break
+            dfn = self.rotation_filename(f"{self.baseFilename}.{i + 1}")
+            do_renames.append((sfn, dfn))
+            sfn = dfn
 
         for sfn, dfn in reversed(do_renames):
             do_rename(sfn, dfn)
@@ -543,13 +961,25 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         dfn = self.rotation_filename(self.baseFilename + ".1")
         do_rename(tmpname, dfn)
 
-        if self.use_gzip:
-            logFilename = self.baseFilename + ".1.gz"
+        if self.compress_ext and self.background_compression:
+            self._compress_in_background(dfn)
+        elif self.compress_ext:
+            logFilename = self.baseFilename + ".1" + self.compress_ext
             self._do_chown_and_chmod(logFilename)
 
         self.num_rollovers += 1
         self._console_log("Rotation completed (on size)")
 
+    @staticmethod
+    def _list_directory(dir_name: str) -> Optional[Set[str]]:
+        """Return the full paths of all the entries in a directory, or None if it
+        can't be listed (e.g. no read permission), in which case check each name."""
+        try:
+            with os.scandir(dir_name or ".") as entries:
+                return {os.path.join(dir_name, entry.name) for entry in entries}
+        except OSError:
+            return None
+
     def shouldRollover(self, record: logging.LogRecord) -> bool:  # noqa: ARG002
         """
         Determine if rollover should occur.
@@ -562,40 +992,195 @@ class ConcurrentRotatingFileHandler(BaseRotatingHandler):
         return self._shouldRollover()
 
     def _shouldRollover(self) -> bool:
-        if self.maxBytes > 0:  # are we rolling over?
-            self.stream = self.do_open()
-            try:
-                self.stream.seek(0, 2)  # due to non-posix-compliant Windows feature
-                if self.stream.tell() >= self.maxBytes:
-                    return True
-            finally:
-                self._close()
-        return False
+        if self.maxBytes <= 0:  # are we rolling over?
+            return False
+        size, self._stream_size = self._stream_size, None
+        if size is not None:
+            return size >= self.maxBytes
+        # Use the stream already opened for writing, if there is one.
+        stream = self.stream
+        if stream is None or stream.closed:
+            if os.name == "posix":
+                # No need to open the file just to find its size.
+                try:
+                    return os.stat(self.baseFilename).st_size >= self.maxBytes
+                except FileNotFoundError:
+                    return False
+            stream = self.do_open()
+        try:
+            # seek() returns the new position, which is the size of the file.
+            # (Seeking at all is due to non-posix-compliant Windows feature.)
+            return stream.seek(0, 2) >= self.maxBytes
+        finally:
+            if stream is not self.stream:
+                stream.close()
+
+    def do_compress(self, input_filename: str) -> None:
+        """Compress a rotated log file with zstd or gzip, as configured."""
+        if self.use_zstd:
+            self.do_zstd(input_filename)
+        else:
+            self.do_gzip(input_filename)
+
+    def do_zstd(self, input_filename: str) -> None:
+        out_filename = input_filename + ".zst"
+        with open(input_filename, "rb") as input_fh:
+            self._write_zstd(input_fh, out_filename)
+
+        os.remove(input_filename)
+        self._console_log(f"#compressed: {out_filename}", stack=False)
 
     def do_gzip(self, input_filename: str) -> None:
         if not gzip:
             self._console_log("#no gzip available", stack=False)
             return
         out_filename = input_filename + ".gz"
-
-        with open(input_filename, "rb") as input_fh, gzip.open(
-            out_filename, "wb"
-        ) as gzip_fh:
-            while True:
-                data = input_fh.read(self.gzip_buffer)
-                if not data:
-                    break
-                gzip_fh.write(data)
+        with open(input_filename, "rb") as input_fh:
+            self._write_gzip(input_fh, out_filename)
 
         os.remove(input_filename)
         self._console_log(f"#gzipped: {out_filename}", stack=False)
 
+    def _write_zstd(self, input_fh: BufferedReader, out_filename: str) -> None:
+        import zstandard  # noqa: PLC0415
+
+        compressor = zstandard.ZstdCompressor(level=self.zstd_level, threads=-1)
+        with open(
+            out_filename, "wb", buffering=self.gzip_buffer
+        ) as out_fh, compressor.stream_writer(out_fh, closefd=False) as zstd_fh:
+            shutil.copyfileobj(input_fh, zstd_fh, self.gzip_buffer)
+
+    def _write_gzip(self, input_fh: BufferedReader, out_filename: str) -> None:
+        if self._pigz:
+            import subprocess  # noqa: PLC0415
+
+            try:
+                with open(out_filename, "wb") as pigz_out:
+                    subprocess.run(  # noqa: S603
+                        [self._pigz, f"-{self.gzip_compresslevel}", "-c"],
+                        stdin=input_fh,
+                        stdout=pigz_out,
+                        check=True,
+                    )
+                return
+            except (OSError, subprocess.CalledProcessError) as e:
+                self._console_log(f"pigz failed, using the gzip module instead: {e}")
+                input_fh.seek(0)
+        with open(
+            out_filename, "wb", buffering=self.gzip_buffer
+        ) as out_fh, gzip.GzipFile(
+            fileobj=out_fh, mode="wb", compresslevel=self.gzip_compresslevel
+        ) as gzip_fh:
+            shutil.copyfileobj(input_fh, gzip_fh, self.gzip_buffer)
+
+    def _compress_in_background(self, filename: str) -> None:
+        """Start compressing a just rotated (and still uncompressed) log file on the
+        background thread. The result is put in place by _finish_compressions()."""
+        if self._compress_pid != os.getpid():
+            # Threads don't survive fork(), and jobs the parent started are its to finish.
+            from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+            self._compress_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="ConcurrentLogHandlerCompress"
+            )
+            self._compress_jobs = []
+            self._compress_pid = os.getpid()
+        input_fh = open(filename, "rb")
+        try:
+            file_stat = os.fstat(input_fh.fileno())
+            out_filename = (
+                f"{self.baseFilename}.rotate.{os.urandom(8).hex()}{self.compress_ext}"
+            )
+            if TYPE_CHECKING:
+                assert self._compress_executor is not None
+            future = self._compress_executor.submit(
+                self._compress_job, input_fh, out_filename
+            )
+        except BaseException:
+            input_fh.close()
+            raise
+        self._compress_jobs.append(
+            (future, out_filename, (file_stat.st_dev, file_stat.st_ino))
+        )
+
+    def _compress_job(self, input_fh: BufferedReader, out_filename: str) -> None:
+        """Body of a background compression job."""
+        try:
+            with input_fh:
+                if self.use_zstd:
+                    self._write_zstd(input_fh, out_filename)
+                else:
+                    self._write_gzip(input_fh, out_filename)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(out_filename)
+            raise
+
+    def _finish_compressions(self, wait: bool = False) -> None:
+        """Put the files compressed in the background in place of the uncompressed
+        rotated files. The lock must be held.
+
+        Other processes may have rotated the file further along (e.g. from .1 to .2)
+        in the meantime, so it is looked for by its inode. If it has already been
+        deleted because of backupCount, the compressed copy is simply thrown away.
+        """
+        if not self._compress_jobs or self._compress_pid != os.getpid():
+            return
+        still_running = []
+        for future, out_filename, file_id in self._compress_jobs:
+            if not wait and not future.done():
+                still_running.append((future, out_filename, file_id))
+                continue
+            try:
+                future.result()
+            except Exception as e:
+                self._console_log(f"Background compression failed: {e}")
+                continue
+            try:
+                self._place_compressed_file(out_filename, file_id)
+            except OSError as e:
+                self._console_log(f"Couldn't put compressed file in place: {e}")
+        self._compress_jobs = still_running
+
+    def _place_compressed_file(
+        self, out_filename: str, file_id: Tuple[int, int]
+    ) -> None:
+        rotated = self._find_rotated_file(file_id)
+        if rotated is None:
+            os.remove(out_filename)
+            return
+        os.replace(out_filename, rotated + self.compress_ext)
+        os.remove(rotated)
+        self._do_chown_and_chmod(rotated + self.compress_ext)
+        self._console_log(f"#compressed: {rotated + self.compress_ext}")
+
+    def _find_rotated_file(self, file_id: Tuple[int, int]) -> Optional[str]:
+        """Return the name of the uncompressed rotated file with the given (device, inode)."""
+        for i in range(1, self.backupCount + 1):
+            filename = self.rotation_filename(f"{self.baseFilename}.{i}")
+            try:
+                file_stat = os.stat(filename)
+            except FileNotFoundError:
+                if not os.path.exists(filename + self.compress_ext):
+                    return None  # the end of the backups
+                continue
+            if (file_stat.st_dev, file_stat.st_ino) == file_id:
+                return filename
+        return None
+
     def _do_chown_and_chmod(self, filename: str) -> None:
+        # Usually the file already has the right owner and mode, so check first.
+        file_stat = None
         if HAS_CHOWN and self._set_uid is not None and self._set_gid is not None:
-            os.chown(filename, self._set_uid, self._set_gid)
+            file_stat = os.stat(filename)
+            if (file_stat.st_uid, file_stat.st_gid) != (self._set_uid, self._set_gid):
+                os.chown(filename, self._set_uid, self._set_gid)
 
         if HAS_CHMOD and self.chmod is not None:
-            os.chmod(filename, self.chmod)
+            if file_stat is None:
+                file_stat = os.stat(filename)
+            if stat.S_IMODE(file_stat.st_mode) != self.chmod:
+                os.chmod(filename, self.chmod)
 
 
 class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
@@ -612,6 +1197,14 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
     Note that `errors` is ignored unless using Python 3.9 or later.
     """
 
+    _UNSUPPORTED_OPTIONS = (
+        "per_process",
+        "background_compression",
+        "use_kernel_append",
+        "write_buffer_size",
+        "write_buffer_flush_seconds",
+    )
+
     def __init__(  # type: ignore[no-untyped-def] # noqa: PLR0913
         self,
         filename: str,
@@ -632,10 +1225,25 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
         terminator: str = "\n",
         unicode_error_policy: str = "ignore",
         lock_file_directory: Optional[str] = None,
+        gzip_compresslevel: int = 9,
+        gzip_buffer_size: int = 64 * 1024,
+        use_zstd: bool = False,
+        zstd_level: int = 3,
         **kwargs,
     ):
         if "mode" in kwargs:
             del kwargs["mode"]
+        # per_process can't work because the rollover time is shared through the lock
+        # file. The others apply to ConcurrentRotatingFileHandler.emit(), which this
+        # class doesn't use, and compression is always done in the foreground here.
+        for name in self._UNSUPPORTED_OPTIONS:
+            if kwargs.pop(name, False):
+                warnings.warn(
+                    f"concurrent_log_handler parameter `{name}` is not supported by "
+                    "ConcurrentTimedRotatingFileHandler and will be ignored.",
+                    UserWarning,
+                    stacklevel=2,
+                )
         trfh_kwargs: Dict[str, Optional[str]] = {}
         if sys.version_info >= (3, 9):
             trfh_kwargs["errors"] = errors
@@ -666,6 +1274,10 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
             terminator=terminator,
             unicode_error_policy=unicode_error_policy,
             lock_file_directory=lock_file_directory,
+            gzip_compresslevel=gzip_compresslevel,
+            gzip_buffer_size=gzip_buffer_size,
+            use_zstd=use_zstd,
+            zstd_level=zstd_level,
             **kwargs,
         )
         self.num_rollovers = 0
@@ -682,6 +1294,13 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
     def _console_log(self, msg: str, stack: bool = False) -> None:
         self.clh._console_log(msg, stack=stack)
 
+    def close(self) -> None:
+        """Close log stream and the lock file held by the inner handler."""
+        try:
+            self.clh.close()
+        finally:
+            super().close()
+
     def emit(self, record: logging.LogRecord) -> None:
         """
         Emit a record.
@@ -692,8 +1311,10 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
         """
         try:
             msg = self.format(record)
+            data = self.clh._encode_unlocked(msg)
             try:
                 self.clh._do_lock()
+                self.clh._check_stream()
 
                 try:
                     if self.shouldRollover(record):
@@ -706,7 +1327,7 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
                     )
                     # time.sleep(1000)
 
-                self.clh.do_write(msg)
+                self.clh.do_write(msg, data)
 
             finally:
                 self.clh._do_unlock()
@@ -777,11 +1398,13 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
 
     def shouldRollover(self, record: logging.LogRecord) -> bool:
         """Determine if the rollover should occur."""
-        # Read the latest rollover time from the file
-        self.read_rollover_time()
+        # Read the latest rollover time from the file. Rollovers only ever move it
+        # forward, so that's only needed once the one we already know has passed.
+        if int(time.time()) >= self.rolloverAt:
+            self.read_rollover_time()
 
         do_rollover = False
-        if super(ConcurrentTimedRotatingFileHandler, self).shouldRollover(record):
+        if super().shouldRollover(record):
             self._console_log("Rolling over because of time")
             do_rollover = True
         elif self.clh.shouldRollover(record):
@@ -820,11 +1443,20 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
             self.baseFilename + "." + time.strftime(self.suffix, timeTuple)
         )
 
-        gzip_ext = ".gz" if self.clh.use_gzip else ""
+        gzip_ext = self.clh.compress_ext
 
         counter = 1
         if os.path.exists(dfn + gzip_ext):
-            while os.path.exists(f"{dfn}.{counter}{gzip_ext}"):
+            # Several rollovers in this interval: find the next free counter from one
+            # directory listing rather than a stat() for each counter already used.
+            existing = self.clh._list_directory(os.path.dirname(dfn))
+
+            def exists(path: str) -> bool:
+                if existing is None:
+                    return os.path.exists(path)
+                return path in existing
+
+            while exists(f"{dfn}.{counter}{gzip_ext}"):
                 ending = f".{counter - 1}{gzip_ext}"
                 if dfn.endswith(ending):
                     dfn = dfn[: -len(ending)]
@@ -836,11 +1468,11 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
 
         self.rotate(self.baseFilename, dfn)
 
-        if self.clh.use_gzip:
-            self.clh.do_gzip(dfn)
+        if gzip_ext:
+            self.clh.do_compress(dfn)
 
         if self.backupCount > 0:
-            # File will already have gzip extension here if applicable
+            # File will already have compression extension here if applicable
             # Thanks to @moynihan
             for file in self.getFilesToDelete():
                 os.remove(file)
@@ -918,9 +1550,230 @@ class ConcurrentTimedRotatingFileHandler(TimedRotatingFileHandler):
         return result
 
 
+class AsyncConcurrentRotatingFileHandler(ConcurrentRotatingFileHandler):
+    """A ConcurrentRotatingFileHandler which hands records off to a single background
+    thread instead of writing them from the calling thread.
+
+    The calling thread only pays the cost of putting the record on an in-memory queue.
+    The background thread takes records off the queue in batches and writes each batch
+    with `emit_batch()`, so the file lock is taken once per batch instead of once per
+    record. Records which are still queued are written out when the handler is closed,
+    which normally happens from `logging.shutdown()` at process exit.
+
+    As with the `concurrent_log_handler.queue` module, there is no way for the caller
+    to know when a given record has actually been written to the file.
+    """
+
+    _OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        filename: str,
+        mode: str = "a",
+        maxBytes: int = 0,
+        backupCount: int = 0,
+        encoding: Optional[str] = None,
+        debug: bool = False,
+        delay: None = None,
+        use_gzip: bool = False,
+        owner: Optional[Tuple[str, str]] = None,
+        chmod: Optional[int] = None,
+        umask: Optional[int] = None,
+        newline: Optional[str] = None,
+        terminator: str = "\n",
+        unicode_error_policy: str = "ignore",
+        lock_file_directory: Optional[str] = None,
+        gzip_compresslevel: int = 9,
+        gzip_buffer_size: int = 64 * 1024,
+        use_kernel_append: bool = False,
+        use_zstd: bool = False,
+        zstd_level: int = 3,
+        per_process: bool = False,
+        keep_file_open: bool = True,
+        write_buffer_size: int = 0,
+        write_buffer_flush_seconds: float = 1.0,
+        background_compression: bool = False,
+        use_pigz: bool = False,
+        queue_size: int = 0,
+        batch_size: int = 100,
+        flush_interval_ms: int = 0,
+        overflow_policy: str = "block",
+    ):
+        """Takes the same arguments as ConcurrentRotatingFileHandler, plus:
+
+        :param queue_size: maximum number of records waiting to be written. The default
+            of 0 means the queue is unbounded.
+        :param batch_size: maximum number of records the background thread takes off
+            the queue and writes in one go.
+        :param flush_interval_ms: how long the background thread may wait for more
+            records to fill up a batch before writing what it has. The default of 0
+            means queued records are written as soon as the thread gets to them.
+        :param overflow_policy: what to do when a bounded queue is full. One of 'block'
+            (wait for room; the default), 'drop_oldest' (discard the oldest queued
+            record) or 'drop_newest' (discard the record being logged).
+        """
+        super().__init__(
+            filename,
+            mode=mode,
+            maxBytes=maxBytes,
+            backupCount=backupCount,
+            encoding=encoding,
+            debug=debug,
+            delay=delay,
+            use_gzip=use_gzip,
+            owner=owner,
+            chmod=chmod,
+            umask=umask,
+            newline=newline,
+            terminator=terminator,
+            unicode_error_policy=unicode_error_policy,
+            lock_file_directory=lock_file_directory,
+            gzip_compresslevel=gzip_compresslevel,
+            gzip_buffer_size=gzip_buffer_size,
+            use_kernel_append=use_kernel_append,
+            use_zstd=use_zstd,
+            zstd_level=zstd_level,
+            per_process=per_process,
+            keep_file_open=keep_file_open,
+            write_buffer_size=write_buffer_size,
+            write_buffer_flush_seconds=write_buffer_flush_seconds,
+            background_compression=background_compression,
+            use_pigz=use_pigz,
+        )
+        if overflow_policy not in self._OVERFLOW_POLICIES:
+            overflow_policy = "block"
+            warnings.warn(
+                "Invalid overflow_policy for concurrent_log_handler: "
+                "must be block, drop_oldest, or drop_newest. Defaulting to block.",
+                UserWarning,
+                stacklevel=3,
+            )
+        self.overflow_policy = overflow_policy
+        self.queue_size = max(queue_size, 0)
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval_ms = max(flush_interval_ms, 0)
+
+        self._queue: Optional[_RecordQueue] = None
+        self._worker: Optional[threading.Thread] = None
+        # The worker thread does not survive a fork(), so remember which process started it.
+        self._worker_pid: Optional[int] = None
+
+    def _start_worker(self) -> None:
+        # A fresh queue, too, in case we inherited records (or a held queue lock) from our parent.
+        if self.queue_size > 0:
+            self._queue = queue.Queue(self.queue_size)
+        else:
+            # SimpleQueue is lighter weight but only exists on Python 3.7+
+            self._queue = getattr(queue, "SimpleQueue", queue.Queue)()
+        self._worker = threading.Thread(
+            target=self._drain_queue,
+            name=f"{self.__class__.__name__}-{os.path.basename(self.baseFilename)}",
+            daemon=True,
+        )
+        self._worker_pid = os.getpid()
+        self._worker.start()
+        self._console_log("Started background writer thread")
+
+    def _stop_worker(self) -> None:
+        if (
+            self._worker is not None
+            and self._queue is not None
+            and self._worker_pid == os.getpid()
+        ):
+            # The sentinel goes to the back of the queue, so everything before it gets written.
+            self._queue.put(None)
+            self._worker.join()
+            self._console_log("Stopped background writer thread")
+        self._worker = None
+        self._worker_pid = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message arguments into the message now, so that later changes to
+        mutable arguments can't change what gets logged. Like the standard QueueHandler,
+        this works on a copy so other handlers still see the original record."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Put the record on the queue for the background thread to write."""
+        try:
+            if self._worker_pid != os.getpid():
+                self._start_worker()
+            self._enqueue(self.prepare(record))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _enqueue(self, record: logging.LogRecord) -> None:
+        log_queue = self._queue
+        if log_queue is None:
+            return
+        if self.overflow_policy == "block":
+            log_queue.put(record)
+            return
+        while True:
+            try:
+                log_queue.put_nowait(record)
+                return
+            except queue.Full:
+                if self.overflow_policy == "drop_newest":
+                    return
+                with suppress(queue.Empty):  # drop_oldest
+                    log_queue.get_nowait()
+
+    def _drain_queue(self) -> None:
+        """Body of the background thread."""
+        log_queue = self._queue
+        if log_queue is None:
+            return
+        while True:
+            record = log_queue.get()
+            if record is None:
+                break
+            batch = [record]
+            stopping = self._fill_batch(log_queue, batch)
+            self.emit_batch(batch)
+            if stopping:
+                break
+
+    def _fill_batch(
+        self,
+        log_queue: _RecordQueue,
+        batch: List[logging.LogRecord],
+    ) -> bool:
+        """Add more waiting records to the batch. Returns True if the stop sentinel was seen."""
+        deadline = time.monotonic() + self.flush_interval_ms / 1000.0
+        while len(batch) < self.batch_size:
+            try:
+                if self.flush_interval_ms:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    record = log_queue.get(timeout=remaining)
+                else:
+                    record = log_queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is None:
+                return True
+            batch.append(record)
+        return False
+
+    def close(self) -> None:
+        """Write out any queued records, stop the background thread, and close."""
+        try:
+            self._stop_worker()
+        finally:
+            super().close()
+
+
 # Publish these classes to the "logging.handlers" module, so they can be used
 # from a logging config file via logging.config.fileConfig().
 import logging.handlers  # noqa: E402
 
 logging.handlers.ConcurrentRotatingFileHandler = ConcurrentRotatingFileHandler  # type: ignore[attr-defined]
 logging.handlers.ConcurrentTimedRotatingFileHandler = ConcurrentTimedRotatingFileHandler  # type: ignore[attr-defined]
+logging.handlers.AsyncConcurrentRotatingFileHandler = AsyncConcurrentRotatingFileHandler  # type: ignore[attr-defined]
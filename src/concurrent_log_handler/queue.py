@@ -24,7 +24,6 @@ import asyncio
 import atexit
 import logging
 import queue
-import sys
 from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -67,9 +66,6 @@ class AsyncQueueListener(QueueListener):
 
 
 def setup_logging_queues() -> None:
-    if sys.version_info.major < 3:  # noqa: PLR2004
-        raise RuntimeError("This feature requires Python 3.")
-
     queue_listeners: List[AsyncQueueListener] = []
 
     previous_queue_listeners = []
@@ -13,8 +13,10 @@ This test requires Python 3.7 due to the use of dataclasses.
 """
 
 import argparse
+import codecs
 import glob
 import gzip
+import io
 import logging
 import multiprocessing
 import os
@@ -23,14 +25,20 @@ import re
 import string
 import time
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from concurrent_log_handler import (
+    AsyncConcurrentRotatingFileHandler,
     ConcurrentRotatingFileHandler,
     ConcurrentTimedRotatingFileHandler,
 )
 from concurrent_log_handler.__version__ import __version__
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 
 @dataclass(frozen=True)
 class TestOptions:
@@ -54,6 +62,9 @@ class TestOptions:
     use_timed: bool = field(default=False)
     "Use time-based rotation class instead of size-based."
 
+    use_async: bool = field(default=False)
+    "Use the background-thread (async) size-based rotation class."
+
     min_rollovers: int = field(default=70)
     """Minimum number of rollovers to expect. Useful for testing rollover behavior.
     Default is 70 which is appropriate for the default test settings. The actual number
@@ -141,6 +152,8 @@ def worker_process(test_opts: TestOptions, process_id: int, rollover_counter):
             if test_opts.induce_failure
             else ConcurrentTimedRotatingFileHandler
         )
+    elif test_opts.use_async:
+        file_handler_class = AsyncConcurrentRotatingFileHandler
     else:
         file_handler_class = (
             ConcurrentLogHandlerBuggy
@@ -167,29 +180,70 @@ def worker_process(test_opts: TestOptions, process_id: int, rollover_counter):
         logger.debug(f"{process_id}-{i}-{random_str}")
         time.sleep(random.uniform(test_opts.sleep_min, test_opts.sleep_max))
 
+    # Make sure anything still queued (async mode) is written before we count rollovers.
+    file_handler.close()
     rollover_counter.increment(file_handler.num_rollovers)
 
 
+def zstd_open(filename: str, mode: str = "rb") -> io.BytesIO:
+    """Read a whole .zst file; the zstandard reader can't iterate over lines."""
+    with open(filename, mode) as file:
+        return io.BytesIO(zstandard.ZstdDecompressor().stream_reader(file).read())
+
+
+def compressed_ext(test_opts: TestOptions) -> str:
+    """The extension of the rotated log files, or "" if they aren't compressed."""
+    if test_opts.log_opts.get("use_zstd"):
+        return ".zst"
+    if test_opts.log_opts["use_gzip"]:
+        return ".gz"
+    return ""
+
+
+def log_file_opener(test_opts: TestOptions, log_file: str, log_path: str):
+    """The function to open one of the log files with, based on its extension."""
+    ext = compressed_ext(test_opts)
+    if not ext:
+        return open
+    if log_file.endswith(ext):
+        return zstd_open if ext == ".zst" else gzip.open
+    if log_file != log_path:
+        raise AssertionError(
+            f"{ext} compression was set, but log file is not compressed?"
+        )
+    return open
+
+
+def decode_line(test_opts: TestOptions, line: bytes, line_no: int) -> str:
+    """Decode one line of a log file, checking that a byte order mark only appears at the
+    start of the file and that the line ends the way the `newline` option says it should.
+    """
+    if line_no > 0 and line.startswith(codecs.BOM_UTF8):
+        raise AssertionError(f"Byte order mark on line {line_no} of a log file")
+    newline = test_opts.log_opts.get("newline")
+    newline = os.linesep if newline is None else newline or "\n"
+    line_ending = test_opts.log_opts.get("terminator", "\n").replace("\n", newline)
+    if not line.endswith(line_ending.encode("ascii")):
+        raise AssertionError(
+            f"Line {line_no} doesn't end with {line_ending!r}: {line!r}"
+        )
+    return line.decode(test_opts.log_opts["encoding"] or "utf-8")
+
+
 def validate_log_file(test_opts: TestOptions, run_time: float, expect_all=True) -> bool:
     process_tracker = {i: {} for i in range(test_opts.num_processes)}
 
     # Sort log files, starting with the most recent backup
     log_path = os.path.join(test_opts.log_dir, test_opts.log_file)
-    all_log_files = sorted(glob.glob(f"{log_path}*"), reverse=True)
+    all_log_files = sorted(find_log_files(test_opts), reverse=True)
 
-    encoding = test_opts.log_opts["encoding"] or "utf-8"
     chars_read = 0
 
     for current_log_file in all_log_files:
-        opener = open
-        if test_opts.log_opts["use_gzip"]:
-            if current_log_file.endswith(".gz"):
-                opener = gzip.open
-            elif current_log_file != log_path:
-                raise AssertionError("use_gzip was set, but log file is not gzipped?")
+        opener = log_file_opener(test_opts, current_log_file, log_path)
         with opener(current_log_file, "rb") as file:
             for line_no, line in enumerate(file):
-                line = line.decode(encoding)  # noqa: PLW2901
+                line = decode_line(test_opts, line, line_no)  # noqa: PLW2901
                 chars_read += len(line)
                 parts = line.strip().split(" - ")
                 message = parts[-1]
@@ -255,10 +309,9 @@ def run_stress_test(test_opts: TestOptions) -> int:
         f"{rollover_counter.get_value()} - min was {test_opts.min_rollovers})"
     )
 
-    log_path = os.path.join(test_opts.log_dir, test_opts.log_file)
-    all_log_files = glob.glob(f"{log_path}*")
+    all_log_files = find_log_files(test_opts)
 
-    gzip_ext = "[.]gz" if test_opts.log_opts["use_gzip"] else ""
+    gzip_ext = re.escape(compressed_ext(test_opts))
 
     # Issue #68 - check for incorrect naming of files when using TimedRotatingFileHandler
     # and we had to rollover more often than the normal `when` interval due to size limits
@@ -308,9 +361,18 @@ def run_stress_test(test_opts: TestOptions) -> int:
     return 1
 
 
-def delete_log_files(test_opts: TestOptions):
+def find_log_files(test_opts: TestOptions) -> List[str]:
+    """All the log files of a test run, including rotated ones."""
     log_path = os.path.join(test_opts.log_dir, test_opts.log_file)
-    log_files_to_remove = glob.glob(f"{log_path}*")
+    if test_opts.log_opts.get("per_process"):
+        # Each process has its own file, e.g. stress_test.1234.log
+        root, ext = os.path.splitext(log_path)
+        return glob.glob(f"{root}.*{ext}*")
+    return glob.glob(f"{log_path}*")
+
+
+def delete_log_files(test_opts: TestOptions):
+    log_files_to_remove = find_log_files(test_opts)
     _, lock_name = ConcurrentRotatingFileHandler.baseLockFilename(test_opts.log_file)
     log_files_to_remove.append(os.path.join(test_opts.log_dir, lock_name))
     removed_files = []
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# ruff: noqa: S101
+
+"""
+Pytest cases for handler options whose behavior the stress test can't observe,
+such as what happens after a fork().
+"""
+
+import gzip
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence
+
+import pytest
+
+from concurrent_log_handler import (
+    AsyncConcurrentRotatingFileHandler,
+    ConcurrentRotatingFileHandler,
+    ConcurrentTimedRotatingFileHandler,
+)
+
+needs_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork()")
+
+
+@pytest.fixture
+def logger(request: pytest.FixtureRequest) -> Iterator[logging.Logger]:
+    log = logging.getLogger(f"test_handler_options.{request.node.name}")
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    yield log
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+        handler.close()
+
+
+@needs_fork
+def test_per_process_child_writes_its_own_file(
+    tmp_path: Path, logger: logging.Logger
+) -> None:
+    handler = ConcurrentRotatingFileHandler(str(tmp_path / "app.log"), per_process=True)
+    logger.addHandler(handler)
+    logger.info("from the parent")
+
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - runs in the child
+        try:
+            logger.info("from the child")
+            handler.close()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    handler.close()
+
+    parent_log = tmp_path / f"app.{os.getpid()}.log"
+    child_log = tmp_path / f"app.{pid}.log"
+    assert parent_log.read_text() == "from the parent\n"
+    assert child_log.read_text() == "from the child\n"
+
+
+@needs_fork  # background_compression is Unix only
+def test_close_stops_background_compression_thread(
+    tmp_path: Path, logger: logging.Logger
+) -> None:
+    handler = ConcurrentRotatingFileHandler(
+        str(tmp_path / "app.log"),
+        maxBytes=100,
+        backupCount=5,
+        use_gzip=True,
+        background_compression=True,
+    )
+    logger.addHandler(handler)
+    for i in range(20):
+        logger.info("record %d, which is long enough to roll over", i)
+    handler.close()
+
+    assert not [
+        thread
+        for thread in threading.enumerate()
+        if thread.name.startswith("ConcurrentLogHandlerCompress")
+    ]
+    assert sorted(path.name for path in tmp_path.glob("app.log.*")) == [
+        f"app.log.{i}.gz" for i in range(1, 6)
+    ]
+
+
+def test_rollover_when_directory_cannot_be_listed(
+    tmp_path: Path, logger: logging.Logger, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # E.g. a log directory with write but no read permission.
+    def no_listing(path: str) -> None:
+        raise PermissionError(13, "Permission denied", path)
+
+    monkeypatch.setattr(os, "scandir", no_listing)
+    handler = ConcurrentRotatingFileHandler(
+        str(tmp_path / "app.log"), maxBytes=100, backupCount=3
+    )
+    logger.addHandler(handler)
+    for i in range(10):
+        logger.info("record %d, which is long enough to roll over", i)
+    handler.close()
+    monkeypatch.undo()
+
+    assert sorted(path.name for path in tmp_path.glob("app.log*")) == [
+        "app.log",
+        "app.log.1",
+        "app.log.2",
+        "app.log.3",
+    ]
+
+
+def test_async_handler_write_buffer(tmp_path: Path, logger: logging.Logger) -> None:
+    handler = AsyncConcurrentRotatingFileHandler(
+        str(tmp_path / "app.log"),
+        write_buffer_size=4096,
+        write_buffer_flush_seconds=0,
+    )
+    logger.addHandler(handler)
+    for i in range(3):
+        logger.info("record %d", i)
+    handler._stop_worker()  # the batch is written, but only into the buffer
+    assert not (tmp_path / "app.log").exists()
+    handler.close()
+
+    assert (tmp_path / "app.log").read_text() == "record 0\nrecord 1\nrecord 2\n"
+
+
+@pytest.mark.parametrize(
+    "option",
+    ["background_compression", "use_kernel_append", "write_buffer_size"],
+)
+def test_timed_handler_warns_about_unsupported_option(
+    tmp_path: Path, option: str
+) -> None:
+    with pytest.warns(UserWarning, match=option):
+        handler = ConcurrentTimedRotatingFileHandler(
+            str(tmp_path / "app.log"), **{option: 4096}
+        )
+    try:
+        assert not getattr(handler.clh, option)
+    finally:
+        handler.close()
+
+
+RECORDS = [f"record {i}, which is long enough to roll over\n" for i in range(6)]
+
+
+def rotate_with_gzip(path: Path, logger: logging.Logger, **kwargs) -> str:
+    """Log enough through a gzip handler to rotate a few times, and return everything
+    which ended up in the log files, oldest first."""
+    handler = ConcurrentRotatingFileHandler(
+        str(path / "app.log"), maxBytes=100, backupCount=10, use_gzip=True, **kwargs
+    )
+    logger.addHandler(handler)
+    for record in RECORDS:
+        logger.info(record.rstrip())
+    logger.removeHandler(handler)
+    handler.close()
+
+    backups = sorted(path.glob("app.log.*.gz"), reverse=True)
+    assert backups
+    text = ""
+    for backup in backups:
+        with gzip.open(backup, "rt") as file:
+            text += file.read()
+    return text + (path / "app.log").read_text()
+
+
+@pytest.mark.parametrize("pigz", [None, "/nonexistent/pigz"])
+def test_pigz_falls_back_to_gzip_module(
+    tmp_path: Path,
+    logger: logging.Logger,
+    monkeypatch: pytest.MonkeyPatch,
+    pigz: Optional[str],
+) -> None:
+    # pigz is either not on the PATH, or can't be run.
+    monkeypatch.setattr(shutil, "which", lambda _cmd: pigz)
+    assert rotate_with_gzip(tmp_path, logger, use_pigz=True) == "".join(RECORDS)
+
+
+@pytest.mark.skipif(not shutil.which("pigz"), reason="needs the pigz program")
+def test_pigz_compresses_rotated_files(
+    tmp_path: Path, logger: logging.Logger, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    commands = []
+    run = subprocess.run
+
+    def record_run(args, **kwargs):
+        commands.append(os.path.basename(args[0]))
+        return run(args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", record_run)
+    assert rotate_with_gzip(tmp_path, logger, use_pigz=True) == "".join(RECORDS)
+    assert commands
+    assert set(commands) == {"pigz"}
+
+
+def test_write_buffer_flushed_after_interval(
+    tmp_path: Path, logger: logging.Logger
+) -> None:
+    log_file = tmp_path / "app.log"
+    handler = ConcurrentRotatingFileHandler(
+        str(log_file), write_buffer_size=4096, write_buffer_flush_seconds=0.2
+    )
+    logger.addHandler(handler)
+    logger.info("buffered")
+    assert not log_file.exists()
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not (
+        log_file.exists() and log_file.read_text()
+    ):
+        time.sleep(0.05)
+    assert log_file.read_text() == "buffered\n"
+
+
+@pytest.mark.parametrize(
+    ("overflow_policy", "expected"),
+    [("drop_oldest", [0, 3, 4]), ("drop_newest", [0, 1, 2])],
+)
+def test_async_overflow_policy(
+    tmp_path: Path,
+    logger: logging.Logger,
+    overflow_policy: str,
+    expected: List[int],
+) -> None:
+    handler = AsyncConcurrentRotatingFileHandler(
+        str(tmp_path / "app.log"),
+        queue_size=2,
+        batch_size=1,
+        overflow_policy=overflow_policy,
+    )
+    # Hold up the background thread on the first record, so the queue fills up.
+    writing, resume = threading.Event(), threading.Event()
+    emit_batch = handler.emit_batch
+
+    def slow_emit_batch(records: Sequence[logging.LogRecord]) -> None:
+        writing.set()
+        resume.wait(5)
+        emit_batch(records)
+
+    handler.emit_batch = slow_emit_batch  # type: ignore[method-assign]
+    logger.addHandler(handler)
+    logger.info("record 0")
+    assert writing.wait(5)
+    for i in range(1, 5):
+        logger.info("record %d", i)
+    resume.set()
+    handler.close()
+
+    assert (tmp_path / "app.log").read_text() == "".join(
+        f"record {i}\n" for i in expected
+    )
+
+
+class SlowFormatter(logging.Formatter):
+    """Gives the background thread of the async handler something to wait for."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        time.sleep(0.005)
+        return super().format(record)
+
+
+def finishes(target: Callable[[], None]) -> bool:
+    """Run target on another thread, and return whether it finished in time."""
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(10)
+    return not thread.is_alive()
+
+
+def test_async_write_buffer_close_while_holding_handler_lock(
+    tmp_path: Path, logger: logging.Logger
+) -> None:
+    handler = AsyncConcurrentRotatingFileHandler(
+        str(tmp_path / "app.log"), write_buffer_size=4096, batch_size=1
+    )
+    handler.setFormatter(SlowFormatter())
+    logger.addHandler(handler)
+    for i in range(50):
+        logger.info("record %d", i)
+    logger.removeHandler(handler)
+
+    def close_like_shutdown() -> None:
+        # logging.shutdown() holds the handler's lock while it closes the handler.
+        handler.acquire()
+        try:
+            handler.close()
+        finally:
+            handler.release()
+
+    assert finishes(close_like_shutdown)
+    assert (tmp_path / "app.log").read_text() == "".join(
+        f"record {i}\n" for i in range(50)
+    )
+
+
+def test_async_write_buffer_with_full_queue(
+    tmp_path: Path, logger: logging.Logger
+) -> None:
+    # Handler.handle() holds the handler's lock while emit() waits for room on the queue.
+    handler = AsyncConcurrentRotatingFileHandler(
+        str(tmp_path / "app.log"),
+        write_buffer_size=100,
+        queue_size=2,
+        batch_size=1,
+        overflow_policy="block",
+    )
+    handler.setFormatter(SlowFormatter())
+    logger.addHandler(handler)
+
+    def log_records() -> None:
+        for i in range(50):
+            logger.info("record %d", i)
+
+    assert finishes(log_records)
+    handler.close()
+    assert (tmp_path / "app.log").read_text() == "".join(
+        f"record {i}\n" for i in range(50)
+    )
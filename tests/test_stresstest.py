@@ -10,6 +10,8 @@ some logs are deleted before the end of the test and therefore
 don't test specifically for missing lines/items.
 """
 
+import importlib.util
+
 import pytest
 from stresstest import TestOptions, run_stress_test
 
@@ -38,6 +40,44 @@ TEST_CASES = {
             }
         ),
     ),
+    "use_async=True": TestOptions(use_async=True),
+    "use_async=True, num_processes=4, log_calls=3_000, use_gzip=True": TestOptions(
+        use_async=True,
+        num_processes=4,
+        log_calls=3_000,
+        min_rollovers=60,
+        log_opts=TestOptions.default_log_opts({"use_gzip": True}),
+    ),
+    "use_kernel_append=True": TestOptions(
+        log_opts=TestOptions.default_log_opts({"use_kernel_append": True}),
+    ),
+    "write_buffer_size=4096": TestOptions(
+        min_rollovers=40,  # each buffered write can take the file well past maxBytes
+        log_opts=TestOptions.default_log_opts({"write_buffer_size": 4096}),
+    ),
+    "use_gzip=True, background_compression=True": TestOptions(
+        log_opts=TestOptions.default_log_opts(
+            {"use_gzip": True, "background_compression": True}
+        ),
+    ),
+    "backupCount=3, use_gzip=True, background_compression=True": TestOptions(
+        log_opts=TestOptions.default_log_opts(
+            {"backupCount": 3, "use_gzip": True, "background_compression": True}
+        ),
+    ),
+    "encoding=utf-8-sig": TestOptions(
+        min_rollovers=50,  # the default of 70 is borderline with this encoding
+        log_opts=TestOptions.default_log_opts({"encoding": "utf-8-sig"}),
+    ),
+    "newline='', terminator='\\r\\n'": TestOptions(
+        log_opts=TestOptions.default_log_opts({"newline": "", "terminator": "\r\n"}),
+    ),
+    "newline='\\r\\n'": TestOptions(
+        log_opts=TestOptions.default_log_opts({"newline": "\r\n"}),
+    ),
+    "per_process=True": TestOptions(
+        log_opts=TestOptions.default_log_opts({"per_process": True}),
+    ),
     "use_gzip=True": TestOptions(
         log_opts=TestOptions.default_log_opts(
             {
@@ -172,6 +212,23 @@ TEST_CASES = {
     ),
 }
 
+# zstd compression needs the optional zstandard package.
+if importlib.util.find_spec("zstandard"):
+    TEST_CASES["use_zstd=True"] = TestOptions(
+        log_opts=TestOptions.default_log_opts({"use_zstd": True}),
+    )
+    TEST_CASES["backupCount=3, use_zstd=True, use_timed=True, interval=3"] = (
+        TestOptions(
+            use_timed=True,
+            num_processes=4,
+            log_calls=3_000,
+            min_rollovers=4,
+            log_opts=TestOptions.default_timed_log_opts(
+                {"backupCount": 3, "interval": 3, "use_zstd": True}
+            ),
+        )
+    )
+
 
 use_timed_only = False
 